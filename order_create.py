@@ -1,196 +1,380 @@
+import argparse
 import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import ijson
+from ijson.common import ObjectBuilder
+import time
 import uuid
 import pprint
 import logging
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+import sys
+import threading
 
 # Загрузка переменных окружения из .env файла
 load_dotenv()
 API_LOGIN = os.getenv('API_LOGIN')
 
-# Настройка логирования
-logging.basicConfig(filename='script_create_order.log', level=logging.INFO,
-                    format='%(asctime)s %(levelname)s %(message)s')
+# Настройка логирования: полный журнал в файл, сообщения уровня INFO и выше - в консоль
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+file_handler = logging.FileHandler('script_create_order.log', encoding='utf-8')
+file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+logger.addHandler(file_handler)
+console_handler = logging.StreamHandler(sys.stdout)
+console_handler.setLevel(logging.INFO)
+console_handler.setFormatter(logging.Formatter('%(message)s'))
+logger.addHandler(console_handler)
+
+# Повтор запросов при временных ошибках сервера (5xx) с экспоненциальной задержкой.
+# Применяется только к запросам на чтение метаданных: создание заказа не повторяется
+# (каждая попытка может создать заказ), а у получения токена свой цикл повторов.
+# raise_on_status=False: после исчерпания попыток ответ отдаётся как есть,
+# и ошибку поднимает raise_for_status() в вызывающей функции.
+RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+              allowed_methods=frozenset(["GET", "POST"]), raise_on_status=False)
+
+# Задержки (сек.) между повторными попытками получения токена
+TOKEN_RETRY_DELAYS = (2, 5)
+
+ORDER_URL_PREFIX = "https://api-eu.syrve.live/api/1/order/"
+
+# Кэш токена доступа на диске: токен Syrve живёт ~1 час, переиспользуем его 50 минут
+ACCESS_TOKEN_URL = "https://api-eu.syrve.live/api/1/access_token"
+TOKEN_CACHE_PATH = os.path.expanduser("~/.syrve_token.json")
+TOKEN_CACHE_TTL = 3000
+# Защита от одновременного обновления токена из параллельных запросов
+TOKEN_REFRESH_LOCK = threading.Lock()
+
+# Таймауты по умолчанию (соединение, чтение), сек.: быстрый отказ при мёртвом соединении.
+# Запросы метаданных после таймаута переотправляются через RETRY, получение токена -
+# своим циклом повторов
+DEFAULT_TIMEOUT = (3, 10)
+# Создание заказа ждёт ответа от терминала до transportToFrontTimeout (15 с), поэтому
+# время чтения для него больше. После таймаута заказ НЕ переотправляется: он мог быть
+# уже создан на сервере
+ORDER_CREATE_TIMEOUT = (3, 20)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter, подставляющий таймаут по умолчанию, если он не задан при вызове.
+    """
+
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+# Общая HTTP-сессия: keep-alive и пул соединений к api-eu.syrve.live
+SESSION = requests.Session()
+DEFAULT_ADAPTER = TimeoutHTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=RETRY)
+SESSION.mount("https://", DEFAULT_ADAPTER)
+# Более длинный префикс имеет приоритет: заказы и токен отправляются без повторов на уровне адаптера.
+# Пул соединений у всех адаптеров общий, чтобы keep-alive соединение переиспользовалось
+for no_retry_prefix in (ORDER_URL_PREFIX, ACCESS_TOKEN_URL):
+    no_retry_adapter = TimeoutHTTPAdapter(max_retries=0)
+    no_retry_adapter.poolmanager = DEFAULT_ADAPTER.poolmanager
+    SESSION.mount(no_retry_prefix, no_retry_adapter)
+# Все запросы к API отправляют JSON; Authorization добавляется после получения токена
+SESSION.headers["Content-Type"] = "application/json"
+
+
+def iter_json_items(stream, prefixes: tuple):
+    """
+    Потоковый разбор JSON: отдаёт пары (prefix, объект) для элементов с указанными
+    префиксами (в нотации ijson), не загружая весь ответ в память.
+    """
+    events = ijson.parse(stream, use_float=True)
+    for prefix, event, value in events:
+        if prefix not in prefixes:
+            continue
+        if event not in ('start_map', 'start_array'):
+            yield prefix, value
+            continue
+        builder = ObjectBuilder()
+        end_event = event.replace('start', 'end')
+        current = prefix
+        while (current, event) != (prefix, end_event):
+            builder.event(event, value)
+            current, event, value = next(events)
+        yield prefix, builder.value
+
+
+def load_cached_token(api_login: str) -> str:
+    """
+    Чтение токена из файлового кэша. Возвращает None, если кэша нет или он устарел.
+    """
+    try:
+        with open(TOKEN_CACHE_PATH, 'rb') as f:
+            saved = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if saved.get('apiLogin') != api_login or time.time() - saved.get('ts', 0) >= TOKEN_CACHE_TTL:
+        return None
+    return saved.get('token')
 
 
-def get_access_token(api_login: str) -> str:
+def save_cached_token(api_login: str, token: str):
+    """
+    Сохранение токена в файловый кэш (доступен только владельцу).
+    """
+    try:
+        fd = os.open(TOKEN_CACHE_PATH, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        # режим в os.open действует только при создании файла - уже существующему тоже выставляем 0600
+        os.fchmod(fd, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(orjson.dumps({"apiLogin": api_login, "token": token, "ts": time.time()}))
+    except OSError as err:
+        logger.warning("Не удалось сохранить токен в кэш: %s", err)
+
+
+def invalidate_cached_token():
+    """
+    Удаление файлового кэша токена.
+    """
+    try:
+        os.remove(TOKEN_CACHE_PATH)
+    except FileNotFoundError:
+        pass
+    except OSError as err:
+        logger.warning("Не удалось удалить кэш токена: %s", err)
+
+
+def set_session_token(token: str):
+    """
+    Установка заголовка авторизации для общей сессии.
+    """
+    SESSION.headers["Authorization"] = f"Bearer {token}"
+
+
+def refresh_token_on_401(response, *args, **kwargs):
+    """
+    Хук сессии: при ответе 401 сбрасывает кэш, получает новый токен
+    и один раз повторяет исходный запрос.
+    """
+    request = response.request
+    if (response.status_code != 401 or request.url == ACCESS_TOKEN_URL
+            or getattr(request, 'token_refreshed', False)):
+        return response
+
+    with TOKEN_REFRESH_LOCK:
+        authorization = SESSION.headers.get("Authorization")
+        if authorization == request.headers.get("Authorization"):
+            logger.info("Токен доступа отклонён (401), запрашиваем новый.")
+            if not get_access_token(API_LOGIN, force=True):
+                return response
+            authorization = SESSION.headers["Authorization"]
+        # иначе токен уже обновлён другим потоком - просто повторяем запрос с ним
+
+    response.close()
+    retry_request = request.copy()
+    retry_request.headers["Authorization"] = authorization
+    retry_request.token_refreshed = True
+    return SESSION.send(retry_request, **kwargs)
+
+
+def get_access_token(api_login: str, force: bool = False) -> str:
     """
     Получение токена доступа.
+    Токен берётся из файлового кэша, если он ещё действителен; force=True сбрасывает кэш.
     """
-    url = "https://api-eu.syrve.live/api/1/access_token"
-    headers = {"Content-Type": "application/json"}
+    if force:
+        invalidate_cached_token()
+    else:
+        token = load_cached_token(api_login)
+        if token:
+            logger.info("Используется сохранённый токен доступа.")
+            set_session_token(token)
+            return token
+
+    url = ACCESS_TOKEN_URL
     payload = {"apiLogin": api_login}
 
-    try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        token = data.get('token')
-        if not token:
-            logging.error("Не удалось получить токен из ответа.")
-            print("Не удалось получить токен из ответа.")
-            return None
-        logging.info(f"Получен токен доступа: {token}")
-        print(f"Получен токен доступа: {token}")
-        return token
-    except requests.HTTPError as http_err:
-        logging.error(f"HTTP ошибка: {http_err} - Ответ: {response.text}")
-        print(f"HTTP ошибка: {http_err} - Ответ: {response.text}")
-    except Exception as err:
-        logging.error(f"Произошла ошибка: {err}")
-        print(f"Произошла ошибка: {err}")
+    for attempt, delay in enumerate(TOKEN_RETRY_DELAYS + (None,), 1):
+        error_text = None
+        try:
+            # Ответ маленький: читаем сырые байты напрямую, минуя буферизацию и
+            # определение кодировки в requests
+            with SESSION.post(url, data=orjson.dumps(payload), stream=True) as response:
+                if not response.ok:
+                    # тело ответа с ошибкой читается до закрытия соединения, чтобы попасть в лог
+                    error_text = response.text
+                response.raise_for_status()
+                data = orjson.loads(response.raw.read(decode_content=True))
+            token = data.get('token')
+            if not token:
+                logger.error("Не удалось получить токен из ответа.")
+                return None
+            logger.info("Получен токен доступа: %s", token)
+            save_cached_token(api_login, token)
+            set_session_token(token)
+            return token
+        except (requests.ConnectionError, requests.Timeout) as err:
+            # Временная сетевая ошибка - пробуем ещё раз
+            if delay is None:
+                logger.error("Произошла ошибка: %s", err)
+                break
+            logger.warning("Попытка %s получения токена не удалась: %s. Повтор через %s с.", attempt, err, delay)
+            time.sleep(delay)
+        except requests.HTTPError as http_err:
+            # Повторяем только при ошибках сервера (5xx)
+            if delay is not None and response.status_code >= 500:
+                logger.warning("Попытка %s получения токена не удалась: %s. Повтор через %s с.", attempt, http_err, delay)
+                time.sleep(delay)
+                continue
+            logger.error("HTTP ошибка: %s - Ответ: %s", http_err, error_text)
+            break
+        except Exception as err:
+            logger.error("Произошла ошибка: %s", err)
+            break
     return None
 
 
-def get_organizations(token: str) -> list:
+def get_organizations() -> list:
     """
     Получение списка организаций.
     """
     url = "https://api-eu.syrve.live/api/1/organizations"
-    headers = {"Authorization": f"Bearer {token}"}
 
     try:
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         organizations = data.get('organizations', [])
-        logging.info(f"Получено организаций: {len(organizations)}")
+        logger.info("Получено организаций: %s", len(organizations))
         return organizations
     except requests.HTTPError as http_err:
-        logging.error(f"HTTP ошибка при получении организаций: {http_err} - Ответ: {response.text}")
-        print(f"HTTP ошибка при получении организаций: {http_err} - Ответ: {response.text}")
+        logger.error("HTTP ошибка при получении организаций: %s - Ответ: %s", http_err, response.text)
     except Exception as err:
-        logging.error(f"Произошла ошибка при получении организаций: {err}")
-        print(f"Произошла ошибка при получении организаций: {err}")
+        logger.error("Произошла ошибка при получении организаций: %s", err)
     return []
 
 
-def get_terminal_groups(token: str, organization_ids: list) -> list:
+def get_terminal_groups(organization_ids: list) -> list:
     """
     Получение терминальных групп для заданных организаций.
     """
     url = "https://api-eu.syrve.live/api/1/terminal_groups"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
     payload = {
         "organizationIds": organization_ids,
         "includeDisabled": True,
         "returnExternalData": ["string"]
     }
 
+    error_text = None
     try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        # терминальные группы могут возвращаться в двух полях:
-        # 'terminalGroups' и 'terminalGroupsInSleep'
-        terminal_groups_data = data.get('terminalGroups', []) + data.get('terminalGroupsInSleep', [])
-        terminal_groups = []
-        for group_block in terminal_groups_data:
-            items = group_block.get('items', [])
-            organization_id = group_block.get('organizationId')
-            for item in items:
-                tg_id = item.get('id')
-                tg_name = item.get('name', 'NoName')
-                if tg_id:
-                    terminal_groups.append({
-                        'id': tg_id,
-                        'name': tg_name,
-                        'organizationId': organization_id
-                    })
-        logging.info(f"Получено терминальных групп: {len(terminal_groups)}")
+        with SESSION.post(url, data=orjson.dumps(payload), stream=True) as response:
+            if not response.ok:
+                # тело ответа с ошибкой читается до закрытия соединения, чтобы попасть в лог
+                error_text = response.text
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # терминальные группы могут возвращаться в двух полях:
+            # 'terminalGroups' и 'terminalGroupsInSleep'.
+            # Ответ разбирается потоково, по одному блоку организации за раз.
+            terminal_groups = []
+            for _, group_block in iter_json_items(response.raw, ('terminalGroups.item', 'terminalGroupsInSleep.item')):
+                items = group_block.get('items', [])
+                organization_id = group_block.get('organizationId')
+                for item in items:
+                    tg_id = item.get('id')
+                    tg_name = item.get('name', 'NoName')
+                    if tg_id:
+                        terminal_groups.append({
+                            'id': tg_id,
+                            'name': tg_name,
+                            'organizationId': organization_id
+                        })
+        logger.info("Получено терминальных групп: %s", len(terminal_groups))
         return terminal_groups
     except requests.HTTPError as http_err:
-        logging.error(f"HTTP ошибка при получении терминальных групп: {http_err} - Ответ: {response.text}")
-        print(f"HTTP ошибка при получении терминальных групп: {http_err} - Ответ: {response.text}")
+        logger.error("HTTP ошибка при получении терминальных групп: %s - Ответ: %s", http_err, error_text)
     except Exception as err:
-        logging.error(f"Произошла ошибка при получении терминальных групп: {err}")
-        print(f"Произошла ошибка при получении терминальных групп: {err}")
+        logger.error("Произошла ошибка при получении терминальных групп: %s", err)
     return []
 
 
-def get_available_restaurant_sections(token: str, terminal_group_ids: list, return_schema=False, revision=0) -> list:
+def get_available_restaurant_sections(terminal_group_ids: list, return_schema=False, revision=0) -> list:
     """
     Получение доступных секций ресторанов (таблиц) для выбранных групп терминалов.
     """
     url = "https://api-eu.syrve.live/api/1/reserve/available_restaurant_sections"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
     payload = {
         "terminalGroupIds": terminal_group_ids,
         "returnSchema": return_schema,
         "revision": revision
     }
 
+    error_text = None
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        restaurant_sections = data.get('restaurantSections', [])
-        logging.info(f"Получено секций ресторанов: {len(restaurant_sections)}")
+        with SESSION.post(url, data=orjson.dumps(payload), stream=True) as response:
+            if not response.ok:
+                # тело ответа с ошибкой читается до закрытия соединения, чтобы попасть в лог
+                error_text = response.text
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # Потоковый разбор: из ответа берутся только секции (вместе со столами)
+            restaurant_sections = list(ijson.items(response.raw, 'restaurantSections.item', use_float=True))
+        logger.info("Получено секций ресторанов: %s", len(restaurant_sections))
         return restaurant_sections
     except requests.HTTPError as http_err:
-        logging.error(f"HTTP ошибка при получении секций ресторанов: {http_err} - Ответ: {response.text}")
-        print(f"HTTP ошибка при получении секций ресторанов: {http_err} - Ответ: {response.text}")
+        logger.error("HTTP ошибка при получении секций ресторанов: %s - Ответ: %s", http_err, error_text)
     except Exception as err:
-        logging.error(f"Произошла ошибка при получении секций ресторанов: {err}")
-        print(f"Произошла ошибка при получении секций ресторанов: {err}")
+        logger.error("Произошла ошибка при получении секций ресторанов: %s", err)
     return []
 
 
-def get_payment_types(token: str, organization_ids: list) -> list:
+def get_payment_types(organization_ids: list) -> list:
     """
     Получение списка типов оплат для указанных организаций.
     """
     url = "https://api-eu.syrve.live/api/1/payment_types"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
     payload = {
         "organizationIds": organization_ids
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = SESSION.post(url, data=orjson.dumps(payload))
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
         payment_types = data.get('paymentTypes', [])
-        logging.info(f"Получено типов оплаты: {len(payment_types)}")
+        logger.info("Получено типов оплаты: %s", len(payment_types))
         return payment_types
     except requests.HTTPError as http_err:
-        logging.error(f"HTTP ошибка при получении типов оплаты: {http_err} - Ответ: {response.text}")
-        print(f"HTTP ошибка при получении типов оплаты: {http_err} - Ответ: {response.text}")
+        logger.error("HTTP ошибка при получении типов оплаты: %s - Ответ: %s", http_err, response.text)
     except Exception as err:
-        logging.error(f"Произошла ошибка при получении типов оплаты: {err}")
-        print(f"Произошла ошибка при получении типов оплаты: {err}")
+        logger.error("Произошла ошибка при получении типов оплаты: %s", err)
     return []
 
 
-def create_order(token: str, organization_id: str, terminal_group_id: str, table_id: str,
+def create_order(organization_id: str, terminal_group_id: str, table_id: str,
                  customer_name: str, customer_phone: str,
                  product_id: str, product_price: float, product_quantity: float,
-                 payment_type_id: str, payment_sum: float) -> dict:
+                 payment_type_id: str, payment_sum: float,
+                 order_id: str = None, position_id: str = None) -> dict:
     """
     Создание заказа на выбранную организацию, терминальную группу, стол.
     С минимальным набором полей.
+    order_id и position_id можно сгенерировать заранее (например, при пакетном создании);
+    если они не переданы, генерируются здесь.
     """
     url = "https://api-eu.syrve.live/api/1/order/create"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
 
-    # Вы можете генерировать positionId, id заказа и т.п. (GUID) заранее
-    order_id = str(uuid.uuid4())
-    position_id = str(uuid.uuid4())
+    if order_id is None:
+        order_id = str(uuid.uuid4())
+    if position_id is None:
+        position_id = str(uuid.uuid4())
 
     payload = {
         "organizationId": organization_id,
@@ -241,24 +425,138 @@ def create_order(token: str, organization_id: str, terminal_group_id: str, table
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=15)
+        response = SESSION.post(url, data=orjson.dumps(payload), timeout=ORDER_CREATE_TIMEOUT)
         response.raise_for_status()
-        data = response.json()
-        logging.info(f"Заказ создан успешно. Ответ: {data}")
+        data = orjson.loads(response.content)
+        # Полный ответ пишется только в файл, в консоль он выводится через pprint ниже
+        logger.debug("Заказ создан успешно. Ответ: %s", data)
         print("\n--- Ответ сервера при создании заказа ---")
         pprint.pprint(data)
         return data
     except requests.HTTPError as http_err:
-        logging.error(f"HTTP ошибка при создании заказа: {http_err} - Ответ: {response.text}")
-        print(f"HTTP ошибка при создании заказа: {http_err} - Ответ: {response.text}")
+        logger.error("HTTP ошибка при создании заказа: %s - Ответ: %s", http_err, response.text)
     except Exception as err:
-        logging.error(f"Произошла ошибка при создании заказа: {err}")
-        print(f"Произошла ошибка при создании заказа: {err}")
+        logger.error("Произошла ошибка при создании заказа: %s", err)
 
     return {}
 
 
+# Параметры, без которых заказ нельзя создать в неинтерактивном режиме
+REQUIRED_ARGS = ('org_id', 'terminal_id', 'table_id', 'product_id', 'price', 'qty', 'payment_type_id')
+
+# Переменные окружения, из которых берутся значения параметров, не переданных в командной строке
+ARG_ENV_VARS = {
+    'org_id': 'SYRVE_ORG_ID',
+    'terminal_id': 'SYRVE_TERMINAL_ID',
+    'table_id': 'SYRVE_TABLE_ID',
+    'product_id': 'SYRVE_PRODUCT_ID',
+    'price': 'SYRVE_PRICE',
+    'qty': 'SYRVE_QTY',
+    'payment_type_id': 'SYRVE_PAYMENT_TYPE_ID',
+    'sum': 'SYRVE_PAYMENT_SUM',
+    'name': 'SYRVE_CUSTOMER_NAME',
+    'phone': 'SYRVE_CUSTOMER_PHONE',
+}
+
+
+def parse_args():
+    """
+    Разбор аргументов командной строки. Незаданные параметры берутся из переменных окружения.
+    Любой явно переданный параметр заказа означает неинтерактивный режим, и тогда неполный набор
+    обязательных параметров - ошибка; без явных параметров запускается интерактивный режим.
+    """
+    parser = argparse.ArgumentParser(
+        description="Создание заказа через Syrve API. "
+                    "Если переданы все обязательные параметры, заказ создаётся без диалога."
+    )
+    parser.add_argument('--org-id', help="ID организации")
+    parser.add_argument('--terminal-id', help="ID терминальной группы")
+    parser.add_argument('--table-id', help="ID стола")
+    parser.add_argument('--product-id', help="UUID товара")
+    parser.add_argument('--price', type=float, help="Цена за единицу товара")
+    parser.add_argument('--qty', type=float, help="Количество")
+    parser.add_argument('--payment-type-id', help="UUID типа оплаты")
+    parser.add_argument('--sum', type=float, help="Сумма платежа (по умолчанию цена * количество)")
+    parser.add_argument('--name', help="Имя клиента (по умолчанию 'Guest')")
+    parser.add_argument('--phone', help="Телефон клиента")
+    args = parser.parse_args()
+
+    passed_explicitly = any(getattr(args, name) is not None for name in ARG_ENV_VARS)
+
+    for name, env_var in ARG_ENV_VARS.items():
+        value = os.getenv(env_var)
+        if getattr(args, name) is None and value:
+            if name in ('price', 'qty', 'sum'):
+                try:
+                    value = float(value)
+                except ValueError:
+                    parser.error(f"некорректное число в переменной окружения {env_var}: {value}")
+            setattr(args, name, value)
+    if args.name is None:
+        args.name = "Guest"
+    if args.phone is None:
+        args.phone = ""
+
+    missing = [name for name in REQUIRED_ARGS if getattr(args, name) is None]
+    if missing and passed_explicitly:
+        parser.error("для неинтерактивного режима не хватает параметров: "
+                     + ", ".join("--" + name.replace('_', '-') for name in missing))
+    args.interactive = bool(missing)
+    return args
+
+
 def main():
+    args = parse_args()
+    SESSION.hooks['response'].append(refresh_token_on_401)
+    try:
+        if args.interactive:
+            run_interactive()
+        else:
+            run_non_interactive(args)
+    finally:
+        SESSION.close()
+
+
+def submit_order(**order_fields) -> dict:
+    """
+    Отправка заказа и вывод результата. Параметры - как у create_order.
+    """
+    print("\n==== ОТПРАВЛЯЕМ ЗАПРОС НА СОЗДАНИЕ ЗАКАЗА ====")
+    result = create_order(**order_fields)
+
+    if result:
+        print("\nСоздание заказа завершено. См. подробности выше.")
+    else:
+        print("\nНе удалось создать заказ.")
+    return result
+
+
+def run_non_interactive(args):
+    """
+    Создание заказа по параметрам командной строки, без запросов метаданных и диалога.
+    """
+    token = get_access_token(API_LOGIN)
+    if not token:
+        print("Не удалось получить токен доступа.")
+        return
+
+    payment_sum = args.sum if args.sum is not None else args.price * args.qty
+
+    submit_order(
+        organization_id=args.org_id,
+        terminal_group_id=args.terminal_id,
+        table_id=args.table_id,
+        customer_name=args.name,
+        customer_phone=args.phone,
+        product_id=args.product_id,
+        product_price=args.price,
+        product_quantity=args.qty,
+        payment_type_id=args.payment_type_id,
+        payment_sum=payment_sum
+    )
+
+
+def run_interactive():
     # 1) Получаем токен
     token = get_access_token(API_LOGIN)
     if not token:
@@ -266,7 +564,7 @@ def main():
         return
 
     # 2) Получаем список организаций
-    organizations = get_organizations(token)
+    organizations = get_organizations()
     if not organizations:
         print("Не удалось получить список организаций.")
         return
@@ -288,8 +586,13 @@ def main():
 
     organization_id = organizations[org_index - 1].get('id')
 
-    # 3) Получаем терминальные группы для выбранной организации
-    terminal_groups = get_terminal_groups(token, [organization_id])
+    # 3) Получаем терминальные группы для выбранной организации.
+    # Типы оплат от терминальной группы не зависят - запрашиваем их параллельно.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        terminal_groups_future = executor.submit(get_terminal_groups, [organization_id])
+        payment_types_future = executor.submit(get_payment_types, [organization_id])
+        terminal_groups = terminal_groups_future.result()
+        payment_types = payment_types_future.result()
     if not terminal_groups:
         print("Не удалось получить терминальные группы.")
         return
@@ -312,43 +615,43 @@ def main():
     terminal_group_id = terminal_groups[tg_index - 1].get('id')
 
     # 4) Получаем доступные столы для выбранной терминальной группы
-    sections = get_available_restaurant_sections(token, [terminal_group_id])
+    sections = get_available_restaurant_sections([terminal_group_id])
     if not sections:
         print("Не удалось получить секции ресторанов.")
         return
 
-    table_dict = {}
-    counter = 1
-    print("\nДоступные столы:")
-    for section in sections:
-        section_name = section.get('name', 'NoSectionName')
-        tables = section.get('tables', [])
-        print(f"\n--- Секция: {section_name} ---")
-        for tbl in tables:
-            table_id = tbl.get('id')
-            table_name = tbl.get('name')
-            print(f"{counter}. {table_name} (ID: {table_id})")
-            table_dict[counter] = table_id
-            counter += 1
-
-    if not table_dict:
+    # Плоский список столов всех секций: (id стола, название стола, название секции)
+    tables_flat = [
+        (tbl.get('id'), tbl.get('name'), section.get('name', 'NoSectionName'))
+        for section in sections
+        for tbl in section.get('tables', [])
+    ]
+
+    if not tables_flat:
         print("Нет доступных столов.")
         return
 
+    print("\nДоступные столы:")
+    current_section = None
+    for idx, (tid, tname, sname) in enumerate(tables_flat, 1):
+        if sname != current_section:
+            print(f"\n--- Секция: {sname} ---")
+            current_section = sname
+        print(f"{idx}. {tname} (ID: {tid})")
+
     table_index = input("\nВведите номер стола: ")
     try:
         table_index = int(table_index)
-        if table_index < 1 or table_index > len(table_dict):
+        if table_index < 1 or table_index > len(tables_flat):
             print("Некорректный номер стола.")
             return
     except ValueError:
         print("Пожалуйста, введите целое число.")
         return
 
-    table_id = table_dict[table_index]
+    table_id = tables_flat[table_index - 1][0]
 
-    # 5) Получаем список типов оплат (опционально)
-    payment_types = get_payment_types(token, [organization_id])
+    # 5) Выбираем тип оплаты (список получен на шаге 3)
     if payment_types:
         print("\nДоступные типы оплат:")
         for idx, pt in enumerate(payment_types, 1):
@@ -405,9 +708,7 @@ def main():
         payment_sum = product_price * product_quantity
 
     # 9) Создание заказа
-    print("\n==== ОТПРАВЛЯЕМ ЗАПРОС НА СОЗДАНИЕ ЗАКАЗА ====")
-    result = create_order(
-        token=token,
+    submit_order(
         organization_id=organization_id,
         terminal_group_id=terminal_group_id,
         table_id=table_id,
@@ -420,11 +721,6 @@ def main():
         payment_sum=payment_sum
     )
 
-    if result:
-        print("\nСоздание заказа завершено. См. подробности выше.")
-    else:
-        print("\nНе удалось создать заказ.")
-
 
 if __name__ == "__main__":
     main()